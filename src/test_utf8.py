@@ -2,7 +2,11 @@
 # all files that start with test_*.py and run all functions with
 # names that start with test_
 
-from utf8 import encode, decode
+import pytest
+
+from utf8 import (
+    encode, decode, code_points, decode_bytes, encode_codepoint_seq
+)
 
 
 def test_reversible() -> None:
@@ -13,3 +17,39 @@ def test_reversible() -> None:
     assert decode(encode('Skåne')) == 'Skåne'
     assert decode(encode('你好, 世界')) == '你好, 世界'
     assert decode(encode('🎃🥳🤪')) == '🎃🥳🤪'
+
+
+def test_code_points() -> None:
+    """Test that code_points matches ord, also for lone surrogates."""
+    for x in ['15€', '你好, 世界', '🎃🥳🤪', '\ud800']:
+        assert code_points(x) == [ord(c) for c in x]
+
+
+def test_decode_bytes() -> None:
+    """Test that decode_bytes agrees with Python's own decoder."""
+    for x in ['15€', 'Skåne', '你好, 世界', '🎃🥳🤪', '', 'hello, world!',
+              'hello, world! ' * 3 + '15€ 你好 🎃 Skåne']:
+        assert list(decode_bytes(x.encode('utf-8'))) == \
+            [ord(c) for c in x]
+
+
+def test_decode_bytes_rejects_malformed() -> None:
+    """Test that overlong, surrogate and truncated sequences are rejected."""
+    for x in [[0xc0, 0xaf], [0xe0, 0x80, 0xaf], [0xed, 0xa0, 0x80],
+              [0xf4, 0x90, 0x80, 0x80], [0x80], [0xe2, 0x82]]:
+        with pytest.raises(ValueError):
+            decode_bytes(x)
+    with pytest.raises(ValueError, match="truncated .* at position 1"):
+        decode_bytes([0x31, 0xe2, 0x82])
+    with pytest.raises(ValueError, match="with 0xe2 at position 0"):
+        decode_bytes([0xe2, 0x41])
+
+
+def test_encode_codepoint_seq() -> None:
+    """Test encode_codepoint_seq against Python's encoder and bad input."""
+    for x in ['15€', 'Skåne', '你好, 世界', '🎃🥳🤪']:
+        assert encode_codepoint_seq([ord(c) for c in x]) == \
+            x.encode('utf-8')
+    for cp in [-1, 0xd800, 0xdfff, 0x110000, 0x400000]:
+        with pytest.raises(ValueError):
+            encode_codepoint_seq([cp])
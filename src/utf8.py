@@ -3,6 +3,9 @@ Decodes a string in UTF-8 (but encoded in hex).
 """
 from __future__ import annotations
 
+import sys
+from array import array
+
 
 # Helper class...
 
@@ -31,13 +34,12 @@ class bits:
         >>> x[1:5]
         bits(0b1001)
         """
-        match idx:
-            case slice(start=i, stop=j):
-                i = i if i is not None else 0
-                mask = (1 << j) - 1 if j is not None else ~0
-                return bits((self._x & mask) >> i)
-            case i:
-                return bits((self._x >> i) & 1)
+        if type(idx) is slice:
+            i = idx.start if idx.start is not None else 0
+            j = idx.stop
+            mask = (1 << j) - 1 if j is not None else ~0
+            return bits((self._x & mask) >> i)
+        return bits((self._x >> idx) & 1)
 
     def __setitem__(self, idx: int | slice, val: int | bits) -> bits:
         """
@@ -56,15 +58,14 @@ class bits:
         bits(0b111101)
         """
         val = val._x if isinstance(val, bits) else val
-        match idx:
-            case slice(start=i, stop=j):
-                i = i if i is not None else 0
-                j = j if j is not None else 33  # assuming 32-bit ints
-                if val.bit_length() > j - i:
-                    raise ValueError(f"{bin(val)} has too many bits")
-                clear_mask = ~(((1 << j) - 1) ^ ((1 << i) - 1))
-                self._x &= clear_mask  # clear the current bits
-                self._x |= (val << i)  # and set the new ones
+        if type(idx) is slice:
+            i = idx.start if idx.start is not None else 0
+            j = idx.stop if idx.stop is not None else 33  # 32-bit ints
+            if val.bit_length() > j - i:
+                raise ValueError(f"{bin(val)} has too many bits")
+            clear_mask = ~(((1 << j) - 1) ^ ((1 << i) - 1))
+            self._x &= clear_mask  # clear the current bits
+            self._x |= (val << i)  # and set the new ones
         return self
 
     def __str__(self) -> str:
@@ -115,7 +116,7 @@ def code_points(x: str) -> list[int]:
     >>> code_points("🎃🥳🤪")
     [127875, 129395, 129322]
     """
-    ...
+    return list(map(ord, x))
 
 
 def encode_codepoint(codepoint: int) -> str:
@@ -135,53 +136,184 @@ def encode_codepoint(codepoint: int) -> str:
     >>> encode_codepoint(ord("🎃"))
     'f09f8e83'
     """
+    return encode_codepoint_seq([codepoint]).hex()
+
+
+def encode_codepoint_seq(x: list[int]) -> bytes:
+    """
+    Encode a sequence of code points as UTF-8 bytes.
+
+    >>> encode_codepoint_seq([49, 53, 8364])
+    b'15\\xe2\\x82\\xac'
+
+    >>> encode_codepoint_seq([127875]).hex()
+    'f09f8e83'
+
+    Values outside 0..0x10FFFF and surrogates have no UTF-8 encoding.
+
+    >>> encode_codepoint_seq([0xd800])
+    Traceback (most recent call last):
     ...
+    ValueError: invalid code point 0xd800
+    """
+    out = bytearray()
+    append, extend = out.append, out.extend
+    for cp in x:
+        if cp < 0x80:
+            if cp < 0:
+                raise ValueError(f"invalid code point {cp:#x}")
+            append(cp)
+        elif cp < 0x800:
+            extend(bytes((0xC0 | (cp >> 6), 0x80 | (cp & 0x3F))))
+        elif cp < 0x10000:
+            if 0xD800 <= cp < 0xE000:
+                raise ValueError(f"invalid code point {cp:#x}")
+            extend(bytes((
+                0xE0 | (cp >> 12),
+                0x80 | ((cp >> 6) & 0x3F),
+                0x80 | (cp & 0x3F),
+            )))
+        else:
+            if cp > 0x10FFFF:
+                raise ValueError(f"invalid code point {cp:#x}")
+            extend(bytes((
+                0xF0 | (cp >> 18),
+                0x80 | ((cp >> 12) & 0x3F),
+                0x80 | ((cp >> 6) & 0x3F),
+                0x80 | (cp & 0x3F),
+            )))
+    return bytes(out)
 
 
 def encode(x: str) -> str:
     """
     Encode a string as UTF-8 (written in hex).
 
+    This goes through Python's built-in UTF-8 codec; the functions
+    above spell out the algorithm one code point at a time.
+
     >>> encode('15€')
     '3135e282ac'
 
     >>> encode('你好, 世界')
     'e4bda0e5a5bd2c20e4b896e7958c'
     """
-    return ''.join(
-        encode_codepoint(cp) for cp in code_points(x)
-    )
+    return x.encode('utf-8').hex()
 
 
 # Decoding
 
-def get_bytes(x: str) -> list[int]:
+# Bjoern Hoehrmann's UTF-8 DFA, see
+# https://bjoern.hoehrmann.de/utf-8/decoder/dfa/
+# The first 256 entries map a byte to a character class, the rest map
+# a state plus a class to the next state. States are pre-multiplied by
+# 12 so the transition needs no shift.
+_UTF8D = bytes([
+    # 0x00-0x7F
+    *[0] * 128,
+    # 0x80-0x8F, 0x90-0x9F, 0xA0-0xBF
+    *[1] * 16, *[9] * 16, *[7] * 32,
+    # 0xC0-0xC1, 0xC2-0xDF
+    8, 8, *[2] * 30,
+    # 0xE0, 0xE1-0xEC, 0xED, 0xEE-0xEF
+    10, *[3] * 12, 4, 3, 3,
+    # 0xF0, 0xF1-0xF3, 0xF4, 0xF5-0xFF
+    11, 6, 6, 6, 5, *[8] * 11,
+    # Transitions
+    0, 12, 24, 36, 60, 96, 84, 12, 12, 12, 48, 72,
+    12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12,
+    12, 0, 12, 12, 12, 12, 12, 0, 12, 0, 12, 12,
+    12, 24, 12, 12, 12, 12, 12, 24, 12, 24, 12, 12,
+    12, 12, 12, 12, 12, 12, 12, 24, 12, 12, 12, 12,
+    12, 24, 12, 12, 12, 12, 12, 12, 12, 24, 12, 12,
+    12, 12, 12, 12, 12, 12, 12, 36, 12, 36, 12, 12,
+    12, 36, 12, 12, 12, 12, 12, 36, 12, 36, 12, 12,
+    12, 36, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12,
+])
+_UTF8_ACCEPT = 0
+_UTF8_REJECT = 12
+
+# UTF-32 in native byte order is exactly code points as 32-bit ints.
+_UTF32 = 'utf-32-le' if sys.byteorder == 'little' else 'utf-32-be'
+
+
+def get_bytes(x: str) -> bytes:
     """
     Extract the individual bytes in the string x.
 
-    >>> get_bytes('E282AC')
+    >>> list(get_bytes('E282AC'))
     [226, 130, 172]
     """
-    ...
+    return bytes.fromhex(x)
 
 
-def decode_bytes(x: list[int]) -> list[int]:
-    """
-    Translate a UTF-8 encoded sequence into a list of code points.
+def decode_bytes(x: bytes | list[int]) -> array[int]:
     """
+    Translate a UTF-8 encoded sequence into an array of code points.
+
+    The code points are stored as C ints in an array('i') rather than as
+    a list of Python int objects.
+
+    >>> decode_bytes([0x31, 0x35, 0xe2, 0x82, 0xac])
+    array('i', [49, 53, 8364])
+
+    >>> decode_bytes([0xf0, 0x9f, 0x8e, 0x83])
+    array('i', [127875])
+
+    Malformed input, such as overlong forms, surrogates and truncated
+    sequences, is rejected.
+
+    >>> decode_bytes([0xc0, 0xaf])
+    Traceback (most recent call last):
     ...
+    ValueError: invalid UTF-8 sequence starting with 0xc0 at position 0
+    """
+    buf = bytes(x)
+    if buf.isascii():
+        # Every byte is its own code point; let the codecs widen them.
+        return array('i', buf.decode('ascii').encode(_UTF32))
+    n = len(buf)
+    # There are never more code points than bytes.
+    res = array('i', [0]) * n
+    o = 0
+    utf8d = _UTF8D
+    state = _UTF8_ACCEPT
+    cp = 0
+    start = i = 0  # start is where the current sequence began
+    while i < n:
+        b = buf[i]
+        t = utf8d[b]
+        if state:
+            cp = (cp << 6) | (b & 0x3F)
+        else:
+            cp = (0xFF >> t) & b
+            start = i
+        state = utf8d[256 + state + t]
+        if state == _UTF8_ACCEPT:
+            res[o] = cp
+            o += 1
+        elif state == _UTF8_REJECT:
+            raise ValueError(
+                "invalid UTF-8 sequence starting with "
+                f"{buf[start]:#04x} at position {start}"
+            )
+        i += 1
+    if state != _UTF8_ACCEPT:
+        raise ValueError(f"truncated UTF-8 sequence at position {start}")
+    return res[:o]
 
 
 def decode(x: str) -> str:
     """
     Translate a UTF-8 encoded sequence into a list of code points.
 
+    This goes through Python's built-in UTF-8 codec; get_bytes() and
+    decode_bytes() spell out the algorithm one code point at a time.
+
     >>> decode('3135e282ac')
     '15€'
 
     >>> decode('e4bda0e5a5bd2c20e4b896e7958c')
     '你好, 世界'
     """
-    return ''.join(
-        chr(cp) for cp in decode_bytes(get_bytes(x))
-    )
+    return bytes.fromhex(x).decode('utf-8')